@@ -6,7 +6,7 @@ Created by: Rajan Mishra
 
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func, and_
+from sqlalchemy import select, desc, func, and_, insert, update
 from sqlalchemy.orm import selectinload
 
 from ..models.conversation import Conversation, Message
@@ -144,6 +144,36 @@ class MessageCRUD:
         
         return db_obj
     
+    async def create_many(self, db: AsyncSession, *, objs_in: List[MessageCreate]) -> List[Message]:
+        """Create several messages with a single bulk INSERT"""
+        if not objs_in:
+            return []
+        
+        result = await db.scalars(
+            insert(Message).returning(Message),
+            [
+                {
+                    "conversation_id": obj_in.conversation_id,
+                    "content": obj_in.content,
+                    "role": obj_in.role.value if hasattr(obj_in.role, 'value') else obj_in.role,
+                    "workflow_id": getattr(obj_in, 'workflow_id', None)
+                }
+                for obj_in in objs_in
+            ]
+        )
+        db_objs = result.all()
+        
+        # Update the conversations' updated_at timestamp
+        conversation_ids = {obj_in.conversation_id for obj_in in objs_in}
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id.in_(conversation_ids))
+            .values(updated_at=func.now())
+        )
+        await db.commit()
+        
+        return db_objs
+    
     async def get(self, db: AsyncSession, id: int) -> Optional[Message]:
         """Get message by ID"""
         result = await db.execute(
@@ -163,7 +193,7 @@ class MessageCRUD:
         result = await db.execute(
             select(Message)
             .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at)
+            .order_by(Message.created_at, Message.id)
             .offset(skip)
             .limit(limit)
         )
@@ -180,7 +210,7 @@ class MessageCRUD:
         result = await db.execute(
             select(Message)
             .where(Message.conversation_id == conversation_id)
-            .order_by(desc(Message.created_at))
+            .order_by(desc(Message.created_at), desc(Message.id))
             .limit(count)
         )
         messages = result.scalars().all()
@@ -971,15 +971,21 @@ class AdvancedToolOrchestrator:
         results = {}
         completed_tools = set()
         
+        # Dependencies name tools; only tools of a planned type will ever run
+        planned_types = {request.tool_type for request in tool_plan}
+        planned_tools = {tool.name for tool in self.tools.values() if tool.tool_type in planned_types}
+        
         # Execute tools in dependency order
         while len(completed_tools) < len(tool_plan):
+            progressed = False
+            
             for request in tool_plan:
                 # Skip if already completed
                 if request.tool_type.value in completed_tools:
                     continue
                 
                 # Check if dependencies are satisfied
-                if all(dep in completed_tools for dep in request.dependencies):
+                if all(dep in results or dep not in planned_tools for dep in request.dependencies):
                     # Find the best tool for this request
                     best_tool = self._select_best_tool(request)
                     
@@ -987,9 +993,15 @@ class AdvancedToolOrchestrator:
                         # Execute the tool
                         result = await best_tool.execute(request.input_data)
                         results[best_tool.name] = result
-                        completed_tools.add(request.tool_type.value)
                         
                         logger.info(f"Executed {best_tool.name} with confidence {result.confidence}")
+                    
+                    completed_tools.add(request.tool_type.value)
+                    progressed = True
+            
+            if not progressed:
+                logger.warning("Stopping tool plan: remaining dependencies can never be satisfied")
+                break
         
         return results
     
@@ -6,6 +6,37 @@ Verifies EVERY requirement from the original assignment
 import requests
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Frontend requirements verified in code rather than over HTTP; fixed, so built once
+FRONTEND_CODE_CHECKS = (
+    ("1.2 Chat Bubble Components", "Components implemented (verified in code)"),
+    ("1.3 Input Field + Send Button", "ChatInput component implemented"),
+    # 2. Conversation Management
+    ("2.1 Conversation List", "ConversationSidebar component implemented"),
+    ("2.2 Conversation Selection", "useConversationStore implemented"),
+    ("2.3 History Loading", "GET /conversations/{id} integration"),
+    # 3. Streaming UX
+    ("3.1 Progressive Display", "StreamingIndicator component implemented"),
+    ("3.2 Typing Rendering", "Real-time streaming implemented"),
+    ("3.3 Smooth Scrolling", "Auto-scroll to bottom implemented"),
+    # 4. UX Considerations
+    ("4.1 Loading Indicators", "Loading states implemented"),
+    ("4.2 Responsive Layout", "Mobile + desktop responsive"),
+    ("4.3 Error Messages", "Error handling implemented"),
+    # 5. Bonus Features
+    ("5.1 Markdown Rendering", "ReactMarkdown implemented"),
+    ("5.2 Dark Mode", "next-themes implementation"),
+    ("5.3 Timestamps", "Message timestamps included"),
+    ("5.4 Code Formatting", "Syntax highlighting ready"),
+)
+
+# Backend check groups, reported as failed together when the server is down
+BACKEND_CHECK_GROUPS = (
+    "1.1 Streaming Chat Endpoint",
+    "2.1-2.2 Database & Conversations",
+    "3.1-3.2 Bonus Features",
+)
 
 class RequirementVerifier:
     def __init__(self):
@@ -14,6 +45,11 @@ class RequirementVerifier:
         self.passed = 0
         self.failed = 0
         
+        # One pooled session so every probe reuses keep-alive connections
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        self.session.mount("http://", adapter)
+        
     def log_test(self, requirement, success, details):
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} | {requirement}: {details}")
@@ -22,11 +58,25 @@ class RequirementVerifier:
         else:
             self.failed += 1
     
+    def _probe(self, url):
+        """Quick reachability check: 1s to connect, 2s to read; any HTTP response counts"""
+        try:
+            self.session.get(url, timeout=(1, 2))
+            return True
+        except requests.RequestException:
+            return False
+    
     def verify_fastapi_backend(self):
         """A. FastAPI Backend Requirements"""
         print("\n🧩 A. FASTAPI BACKEND VERIFICATION")
         print("=" * 60)
         
+        # Fail fast instead of paying every probe's timeout against a dead server
+        if not self._probe(f"{self.backend_url}/api/v1/health"):
+            for requirement in BACKEND_CHECK_GROUPS:
+                self.log_test(requirement, False, f"Backend unreachable at {self.backend_url}")
+            return
+        
         # 1. Streaming Chat Endpoint
         try:
             timestamp = int(time.time())
@@ -37,22 +87,28 @@ class RequirementVerifier:
                 "password": "TestPassword123!",
                 "confirm_password": "TestPassword123!"
             }
-            requests.post(f"{self.backend_url}/api/v1/auth/register", json=test_user)
+            self.session.post(f"{self.backend_url}/api/v1/auth/register", json=test_user)
             
             # Login to get token
             login_data = {"email": test_user["email"], "password": test_user["password"]}
-            login_response = requests.post(f"{self.backend_url}/api/v1/auth/login", json=login_data)
+            login_response = self.session.post(f"{self.backend_url}/api/v1/auth/login", json=login_data)
             token = login_response.json().get("access_token")
             
             # Test streaming chat endpoint
             headers = {"Authorization": f"Bearer {token}"}
             chat_data = {"message": "Hello, test streaming!", "conversation_id": None}
-            response = requests.post(f"{self.backend_url}/api/v1/chat/stream", json=chat_data, headers=headers, timeout=10)
+            # Only the first few chunks are read; leaving the block closes the stream
+            with self.session.post(f"{self.backend_url}/api/v1/chat/stream", json=chat_data, headers=headers, timeout=10, stream=True) as response:
+                chunk_count = 0
+                for _ in response.iter_content(chunk_size=256):
+                    chunk_count += 1
+                    if chunk_count >= 3:
+                        break
             
             has_streaming = response.status_code in [200, 201]
             has_sse_header = "text/event-stream" in response.headers.get("content-type", "").lower()
             self.log_test("1.1 Streaming Chat Endpoint (POST /api/v1/chat)", has_streaming, 
-                         f"Status: {response.status_code}, SSE Headers: {has_sse_header}")
+                         f"Status: {response.status_code}, SSE Headers: {has_sse_header}, Chunks: {chunk_count}")
                          
         except Exception as e:
             self.log_test("1.1 Streaming Chat Endpoint", False, f"Error: {str(e)}")
@@ -61,16 +117,16 @@ class RequirementVerifier:
         try:
             # Test conversations endpoint
             headers = {"Authorization": f"Bearer {token}"}
-            conv_response = requests.get(f"{self.backend_url}/api/v1/conversations", headers=headers)
+            conv_response = self.session.get(f"{self.backend_url}/api/v1/conversations", headers=headers)
             # Try alternative endpoint if main one fails
             if conv_response.status_code == 500:
-                conv_response = requests.get(f"{self.backend_url}/api/v1/chat/conversations", headers=headers)
+                conv_response = self.session.get(f"{self.backend_url}/api/v1/chat/conversations", headers=headers)
             has_conversations = conv_response.status_code in [200, 403]  # 403 = auth required (good)
             self.log_test("2.1 Conversations Endpoint (GET /api/v1/conversations)", has_conversations, 
                          f"Status: {conv_response.status_code}")
             
             # Test PostgreSQL/SQLite database
-            health_response = requests.get(f"{self.backend_url}/api/v1/health")
+            health_response = self.session.get(f"{self.backend_url}/api/v1/health")
             db_connected = health_response.status_code == 200
             self.log_test("2.2 Database Connection (PostgreSQL/SQLite)", db_connected, 
                          f"Health check: {health_response.status_code}")
@@ -89,7 +145,8 @@ class RequirementVerifier:
             if token:
                 headers = {"Authorization": f"Bearer {token}"}
                 rag_data = {"message": "What's the weather like today?", "conversation_id": None}
-                rag_response = requests.post(f"{self.backend_url}/api/v1/chat/stream", json=rag_data, headers=headers, timeout=15)
+                with self.session.post(f"{self.backend_url}/api/v1/chat/stream", json=rag_data, headers=headers, timeout=15, stream=True) as rag_response:
+                    pass  # Status is all that is checked; the body is never read
                 rag_working = rag_response.status_code in [200, 201]
                 self.log_test("3.2 RAG Agent with DuckDuckGo", rag_working, 
                              f"RAG response: {rag_response.status_code}")
@@ -97,14 +154,20 @@ class RequirementVerifier:
         except Exception as e:
             self.log_test("3.1-3.2 Bonus Features", False, f"Error: {str(e)}")
     
-    def verify_nextjs_frontend(self):
-        """B. Next.js Frontend Requirements"""
+    def verify_nextjs_frontend(self, frontend_probe=None):
+        """B. Next.js Frontend Requirements
+        
+        frontend_probe is an optional future already fetching the frontend URL.
+        """
         print("\n🎨 B. NEXT.JS FRONTEND VERIFICATION")
         print("=" * 60)
         
         # 1. Chat UI
         try:
-            response = requests.get(self.frontend_url, timeout=5)
+            if frontend_probe is not None:
+                response = frontend_probe.result()
+            else:
+                response = self.session.get(self.frontend_url, timeout=5)
             frontend_accessible = response.status_code == 200
             self.log_test("1.1 Chat UI Components", frontend_accessible, 
                          f"Frontend accessible: {response.status_code}")
@@ -114,29 +177,8 @@ class RequirementVerifier:
             self.log_test("1.1 Chat UI Components", True, "Components verified in code (frontend implementation complete)")
         
         # Note: Frontend component verification requires browser testing
-        self.log_test("1.2 Chat Bubble Components", True, "Components implemented (verified in code)")
-        self.log_test("1.3 Input Field + Send Button", True, "ChatInput component implemented")
-        
-        # 2. Conversation Management  
-        self.log_test("2.1 Conversation List", True, "ConversationSidebar component implemented")
-        self.log_test("2.2 Conversation Selection", True, "useConversationStore implemented")
-        self.log_test("2.3 History Loading", True, "GET /conversations/{id} integration")
-        
-        # 3. Streaming UX
-        self.log_test("3.1 Progressive Display", True, "StreamingIndicator component implemented")
-        self.log_test("3.2 Typing Rendering", True, "Real-time streaming implemented")
-        self.log_test("3.3 Smooth Scrolling", True, "Auto-scroll to bottom implemented")
-        
-        # 4. UX Considerations
-        self.log_test("4.1 Loading Indicators", True, "Loading states implemented")
-        self.log_test("4.2 Responsive Layout", True, "Mobile + desktop responsive")
-        self.log_test("4.3 Error Messages", True, "Error handling implemented")
-        
-        # 5. Bonus Features
-        self.log_test("5.1 Markdown Rendering", True, "ReactMarkdown implemented")
-        self.log_test("5.2 Dark Mode", True, "next-themes implementation")
-        self.log_test("5.3 Timestamps", True, "Message timestamps included")
-        self.log_test("5.4 Code Formatting", True, "Syntax highlighting ready")
+        for requirement, details in FRONTEND_CODE_CHECKS:
+            self.log_test(requirement, True, details)
     
     def run_complete_verification(self):
         """Run complete requirement verification"""
@@ -144,8 +186,16 @@ class RequirementVerifier:
         print("ChatGPT-Style App Assignment - Client Requirements Check")
         print("=" * 80)
         
-        self.verify_fastapi_backend()
-        self.verify_nextjs_frontend()
+        try:
+            # The frontend probe is independent of the backend's register/login chain,
+            # so it runs in the background while the backend checks log in order;
+            # requests.Session is not thread-safe, so the probe doesn't share it
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                frontend_probe = executor.submit(requests.get, self.frontend_url, timeout=5)
+                self.verify_fastapi_backend()
+                self.verify_nextjs_frontend(frontend_probe)
+        finally:
+            self.session.close()
         
         # Final Summary
         total = self.passed + self.failed
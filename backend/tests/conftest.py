@@ -4,12 +4,47 @@ Shared test fixtures and utility functions
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
+import json
+import os
+import re
+import sys
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
+from httpx import AsyncClient, ASGITransport
 from datetime import datetime, timedelta
 import uuid
 from typing import List, Dict, Any
 
+# Make the backend package importable once for every test module
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Test modules pytest should skip collecting; test_mocked.py and the rest are collected
+collect_ignore = []
+
+# Application fixtures
+@pytest.fixture(scope="session")
+def app():
+    """FastAPI application, imported once per test session"""
+    from main import app
+    return app
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(app):
+    """Async client calling the app in-process, shared by the whole session (no lifespan run)"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop shared with async fixtures"""
+    session_loop_marker = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop_marker, append=False)
+
 # Test data generators
 class TestDataGenerator:
     """Generate test data for various scenarios"""
@@ -75,7 +110,7 @@ class MockOpenAIService:
         
         for response in responses:
             yield response
-            await asyncio.sleep(0.01)  # Simulate streaming delay
+            await asyncio.sleep(0)  # Yield to the event loop between chunks
 
 class MockRAGService:
     """Mock RAG service for testing"""
@@ -136,6 +171,64 @@ class MockOrchestrator:
             }
         }
 
+class FakeChatService:
+    """Fake chat service streaming a fixed list of pre-encoded SSE chunks"""
+    
+    def __init__(self, chunks: List[bytes] = None):
+        self.chunks = chunks if chunks is not None else [
+            b'data: {"type": "content", "content": "Response"}\n\n',
+            b'data: {"type": "complete"}\n\n'
+        ]
+    
+    async def stream_chat_response(self, *args, **kwargs):
+        """Yield the configured chunks"""
+        for chunk in self.chunks:
+            yield chunk
+
+# Fixed timestamp for mock and seeded records, shared by every test module
+FROZEN_NOW = datetime(2024, 1, 1)
+
+def make_mock_conv(id: int = 1, title: str = "Test Conversation"):
+    """Fresh conversation record, so tests can mutate it without leaking into others"""
+    return SimpleNamespace(id=id, title=title, created_at=FROZEN_NOW)
+
+def make_fake_stream(chunks):
+    """Build a stream_chat_response stand-in that yields the given chunks"""
+    async def fake_stream(*args, **kwargs):
+        for chunk in chunks:
+            yield chunk
+    return fake_stream
+
+@pytest.fixture
+def fake_chat_service(monkeypatch):
+    """Swap the chat service behind the streaming route for a FakeChatService"""
+    fake = FakeChatService()
+    monkeypatch.setattr("app.api.chat_enhanced.chat_service", fake)
+    monkeypatch.setattr("app.services.chat_service.EnhancedChatService", lambda *args, **kwargs: fake)
+    return fake
+
+@pytest.fixture
+def agentic_factory():
+    """Build AdvancedAgenticService instances with mocked orchestrator, RAG and OpenAI services"""
+    from app.services.agentic_service import AdvancedAgenticService
+    
+    def make(orch_result=None, rag_context="Context", rag_exc=None, openai_response="Response"):
+        service = AdvancedAgenticService()
+        service.orchestrator = MagicMock()
+        service.orchestrator.orchestrate_workflow = AsyncMock(
+            return_value=orch_result or {"success": True, "workflow_id": "test_workflow"}
+        )
+        service.rag_service = MagicMock()
+        service.rag_service.get_context_from_search = AsyncMock(return_value=rag_context, side_effect=rag_exc)
+        service.openai_service = MagicMock()
+        service.openai_service.generate_response = AsyncMock(return_value=openai_response)
+        return service
+    
+    return make
+
+# Payload of every "data: ..." line in an SSE body
+SSE_DATA_LINE = re.compile(r'^data: (.+)$', re.MULTILINE)
+
 # Test utilities
 class TestUtilities:
     """Utility functions for testing"""
@@ -155,18 +248,31 @@ class TestUtilities:
     @staticmethod
     def parse_sse_messages(response_data: str) -> List[Dict[str, Any]]:
         """Parse SSE messages from response"""
-        import json
+        messages = []
+        
+        for match in SSE_DATA_LINE.finditer(response_data):
+            try:
+                messages.append(json.loads(match.group(1)))
+            except json.JSONDecodeError:
+                continue
         
+        return messages
+    
+    @staticmethod
+    async def read_sse_messages(response) -> List[Dict[str, Any]]:
+        """Parse SSE messages line by line from a streamed response, stopping at the complete event"""
         messages = []
-        lines = response_data.split('\n')
         
-        for line in lines:
-            if line.startswith('data: '):
-                try:
-                    data = json.loads(line[6:])  # Remove 'data: ' prefix
-                    messages.append(data)
-                except json.JSONDecodeError:
-                    continue
+        async for line in response.aiter_lines():
+            if not line.startswith('data: '):
+                continue
+            try:
+                message = json.loads(line[6:])
+            except json.JSONDecodeError:
+                continue
+            messages.append(message)
+            if message.get("type") == "complete":
+                break
         
         return messages
     
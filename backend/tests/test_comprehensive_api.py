@@ -1,21 +1,73 @@
 import pytest
 import asyncio
 import json
-from httpx import AsyncClient
-from unittest.mock import patch, AsyncMock
+import httpx
+import respx
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
+from types import SimpleNamespace
 
-# Import the main app
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from main import app
+# Message longer than the assumed 4000 character limit
+_LONG_MSG = "x" * 5000
+
+# Request bodies sent repeatedly are serialized once up front
+_JSON_CONTENT_TYPE = {"content-type": "application/json"}
+_INVALID_MESSAGE_BODIES = [
+    json.dumps(payload).encode()
+    for payload in ({"message": ""}, {}, {"message": _LONG_MSG})
+]
+_RATE_LIMIT_BODIES = [
+    json.dumps({"message": f"Test message {i}"}).encode()
+    for i in range(10)  # Assuming rate limit is lower than 10/minute
+]
+
+
+@pytest.fixture(scope="session")
+def openai_mock_response():
+    """Streamed OpenAI chunks, built once and shared across tests"""
+    return [
+        SimpleNamespace(choices=[SimpleNamespace(delta={'content': 'Hello'})]),
+        SimpleNamespace(choices=[SimpleNamespace(delta={'content': ' there'})]),
+    ]
+
+
+def _openai_sse_bytes(chunks):
+    """Encode mocked chunks as an OpenAI chat.completion.chunk event stream"""
+    events = [
+        json.dumps({
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": chunk.choices[0].delta}]
+        })
+        for chunk in chunks
+    ]
+    return "".join(f"data: {event}\n\n" for event in events + ["[DONE]"]).encode()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def openai_mock(openai_mock_response):
+    """Intercept OpenAI chat completions at the httpx transport for this module"""
+    with respx.mock(base_url="https://api.openai.com/v1", assert_all_called=False) as router:
+        router.post("/chat/completions", name="chat_completions").respond(
+            200,
+            content=_openai_sse_bytes(openai_mock_response),
+            headers={"content-type": "text/event-stream"}
+        )
+        yield router
+
+
+@pytest.fixture(autouse=True)
+def reset_openai_mock(openai_mock):
+    """Clear recorded calls and per-test side effects on the OpenAI route"""
+    yield
+    openai_mock.reset()
+    openai_mock["chat_completions"].side_effect = None
 
 class TestChatStreamingAPI:
     """Comprehensive tests for /api/v1/chat/stream endpoint"""
     
     @pytest.fixture
-    def client(self):
+    def client(self, app):
         """Test client fixture"""
         return TestClient(app)
     
@@ -29,16 +81,14 @@ class TestChatStreamingAPI:
         """Authentication headers"""
         return {"Authorization": f"Bearer {mock_token}"}
     
-    @pytest.mark.asyncio
-    async def test_chat_stream_endpoint_exists(self, client):
+    def test_chat_stream_endpoint_exists(self, client):
         """Test that the streaming endpoint exists and requires auth"""
         response = client.post("/api/v1/chat/stream", json={"message": "test"})
         assert response.status_code in [401, 422]  # Auth required or validation error
     
-    @pytest.mark.asyncio
     @patch('app.services.chat_service.ChatService.stream_response')
     @patch('app.core.auth.verify_token')
-    async def test_chat_stream_with_valid_auth(self, mock_verify_token, mock_stream, client, auth_headers):
+    def test_chat_stream_with_valid_auth(self, mock_verify_token, mock_stream, client, auth_headers):
         """Test streaming with valid authentication"""
         # Mock authentication
         mock_verify_token.return_value = {"user_id": 1, "email": "test@example.com"}
@@ -77,30 +127,12 @@ class TestChatStreamingAPI:
         assert "chunk" in content
         assert "complete" in content
     
-    @pytest.mark.asyncio
-    @patch('openai.ChatCompletion.acreate')
     @patch('app.core.auth.verify_token')
-    async def test_openai_integration_mock(self, mock_verify_token, mock_openai, client, auth_headers):
+    def test_openai_integration_mock(self, mock_verify_token, client, auth_headers, openai_mock):
         """Test OpenAI integration with mocked API"""
         # Mock authentication
         mock_verify_token.return_value = {"user_id": 1, "email": "test@example.com"}
         
-        # Mock OpenAI response
-        mock_response = AsyncMock()
-        mock_response.__aiter__.return_value = [
-            type('obj', (object,), {
-                'choices': [type('obj', (object,), {
-                    'delta': {'content': 'Hello'}
-                })()]
-            }),
-            type('obj', (object,), {
-                'choices': [type('obj', (object,), {
-                    'delta': {'content': ' there'}
-                })()]
-            })
-        ]
-        mock_openai.return_value = mock_response
-        
         # Test request
         response = client.post(
             "/api/v1/chat/stream",
@@ -113,80 +145,63 @@ class TestChatStreamingAPI:
         )
         
         # Verify OpenAI was called
-        mock_openai.assert_called_once()
-        call_args = mock_openai.call_args
-        assert call_args[1]["model"] == "gpt-3.5-turbo"
-        assert call_args[1]["stream"] == True
-        assert any("Say hello" in str(msg) for msg in call_args[1]["messages"])
+        openai_route = openai_mock["chat_completions"]
+        assert openai_route.call_count == 1
+        request_body = json.loads(openai_route.calls.last.request.content)
+        assert request_body["model"] == "gpt-3.5-turbo"
+        assert request_body["stream"] == True
+        assert any("Say hello" in str(msg) for msg in request_body["messages"])
     
-    @pytest.mark.asyncio
-    async def test_invalid_message_format(self, client, auth_headers):
+    @pytest.mark.parametrize(
+        "body",
+        _INVALID_MESSAGE_BODIES,
+        ids=["empty_message", "missing_message", "message_too_long"]
+    )
+    def test_invalid_message_format(self, client, auth_headers, body):
         """Test validation for invalid message format"""
         with patch('app.core.auth.verify_token') as mock_verify:
             mock_verify.return_value = {"user_id": 1}
             
-            # Test empty message
             response = client.post(
                 "/api/v1/chat/stream",
-                json={"message": ""},
-                headers=auth_headers
-            )
-            assert response.status_code == 422
-            
-            # Test missing message
-            response = client.post(
-                "/api/v1/chat/stream", 
-                json={},
-                headers=auth_headers
-            )
-            assert response.status_code == 422
-            
-            # Test message too long
-            long_message = "x" * 5000  # Assuming 4000 char limit
-            response = client.post(
-                "/api/v1/chat/stream",
-                json={"message": long_message},
-                headers=auth_headers
+                content=body,
+                headers={**auth_headers, **_JSON_CONTENT_TYPE}
             )
             assert response.status_code == 422
     
-    @pytest.mark.asyncio
     @patch('app.core.auth.verify_token')
-    async def test_openai_timeout_handling(self, mock_verify_token, client, auth_headers):
+    def test_openai_timeout_handling(self, mock_verify_token, client, auth_headers, openai_mock):
         """Test OpenAI API timeout handling"""
         mock_verify_token.return_value = {"user_id": 1}
         
-        with patch('openai.ChatCompletion.acreate') as mock_openai:
-            # Mock timeout exception
-            mock_openai.side_effect = asyncio.TimeoutError("Request timeout")
-            
-            response = client.post(
-                "/api/v1/chat/stream",
-                json={"message": "Test timeout"},
-                headers=auth_headers
-            )
-            
-            # Should handle timeout gracefully
-            assert response.status_code in [503, 500]
-            if response.status_code == 503:
-                error_data = response.json()
-                assert "timeout" in error_data["detail"].lower()
+        # Mock timeout exception
+        openai_mock["chat_completions"].side_effect = httpx.ReadTimeout("Request timeout")
+        
+        response = client.post(
+            "/api/v1/chat/stream",
+            json={"message": "Test timeout"},
+            headers=auth_headers
+        )
+        
+        # Should handle timeout gracefully
+        assert response.status_code in [503, 500]
+        if response.status_code == 503:
+            error_data = response.json()
+            assert "timeout" in error_data["detail"].lower()
     
     @pytest.mark.asyncio
     @patch('app.core.auth.verify_token')
-    async def test_rate_limiting(self, mock_verify_token, client, auth_headers):
+    async def test_rate_limiting(self, mock_verify_token, app, auth_headers):
         """Test rate limiting functionality"""
         mock_verify_token.return_value = {"user_id": 1}
         
-        # Send multiple rapid requests
-        responses = []
-        for i in range(10):  # Assuming rate limit is lower than 10/minute
-            response = client.post(
-                "/api/v1/chat/stream",
-                json={"message": f"Test message {i}"},
-                headers=auth_headers
-            )
-            responses.append(response)
+        # Send multiple rapid requests concurrently on one event loop
+        headers = {**auth_headers, **_JSON_CONTENT_TYPE}
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as async_client:
+            responses = await asyncio.gather(*[
+                async_client.post("/api/v1/chat/stream", content=body, headers=headers)
+                for body in _RATE_LIMIT_BODIES
+            ])
         
         # Check if any requests were rate limited
         rate_limited = any(r.status_code == 429 for r in responses)
@@ -197,63 +212,59 @@ class TestChatStreamingAPI:
             assert "rate limit" in error_data["detail"].lower()
             assert "retry_after" in error_data or "retry-after" in rate_limited_response.headers
     
-    @pytest.mark.asyncio
+    @patch('app.services.chat_service.ChatService.stream_response')
     @patch('app.core.auth.verify_token')
-    async def test_conversation_context(self, mock_verify_token, client, auth_headers):
+    def test_conversation_context(self, mock_verify_token, mock_stream, client, auth_headers):
         """Test conversation context handling"""
         mock_verify_token.return_value = {"user_id": 1}
         
-        with patch('app.services.chat_service.ChatService.stream_response') as mock_stream:
-            # Mock conversation service
-            async def mock_stream_generator():
-                yield f'data: {json.dumps({"type": "start_streaming", "conversation_id": 123})}\n\n'
-                yield f'data: {json.dumps({"type": "chunk", "content": "Response"})}\n\n'
-                yield f'data: {json.dumps({"type": "complete", "conversation_id": 123})}\n\n'
-            
-            mock_stream.return_value = mock_stream_generator()
-            
-            # Test with conversation ID
-            response = client.post(
-                "/api/v1/chat/stream",
-                json={
-                    "message": "Continue our discussion",
-                    "conversation_id": 123
-                },
-                headers=auth_headers
-            )
-            
-            assert response.status_code == 200
-            assert "conversation_id" in response.text
+        # Mock conversation service
+        async def mock_stream_generator():
+            yield f'data: {json.dumps({"type": "start_streaming", "conversation_id": 123})}\n\n'
+            yield f'data: {json.dumps({"type": "chunk", "content": "Response"})}\n\n'
+            yield f'data: {json.dumps({"type": "complete", "conversation_id": 123})}\n\n'
+        
+        mock_stream.return_value = mock_stream_generator()
+        
+        # Test with conversation ID
+        response = client.post(
+            "/api/v1/chat/stream",
+            json={
+                "message": "Continue our discussion",
+                "conversation_id": 123
+            },
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert "conversation_id" in response.text
     
-    @pytest.mark.asyncio
-    async def test_rag_enhancement_integration(self, client, auth_headers):
+    @patch('app.services.chat_service.ChatService.stream_response')
+    @patch('app.agents.rag_agent.RAGAgent.search')
+    @patch('app.core.auth.verify_token')
+    def test_rag_enhancement_integration(self, mock_verify, mock_search, mock_stream, client, auth_headers):
         """Test RAG (DuckDuckGo search) enhancement"""
-        with patch('app.core.auth.verify_token') as mock_verify:
-            mock_verify.return_value = {"user_id": 1}
-            
-            with patch('app.agents.rag_agent.RAGAgent.search') as mock_search:
-                mock_search.return_value = "Current information about the topic"
-                
-                with patch('app.services.chat_service.ChatService.stream_response') as mock_stream:
-                    async def mock_rag_stream():
-                        yield f'data: {json.dumps({"type": "rag_searching", "query": "current weather"})}\n\n'
-                        yield f'data: {json.dumps({"type": "chunk", "content": "Based on current data"})}\n\n'
-                        yield f'data: {json.dumps({"type": "complete"})}\n\n'
-                    
-                    mock_stream.return_value = mock_rag_stream()
-                    
-                    # Test message that should trigger RAG
-                    response = client.post(
-                        "/api/v1/chat/stream",
-                        json={"message": "What's the current weather like?"},
-                        headers=auth_headers
-                    )
-                    
-                    assert response.status_code == 200
-                    assert "rag_searching" in response.text
+        mock_verify.return_value = {"user_id": 1}
+        mock_search.return_value = "Current information about the topic"
+        
+        async def mock_rag_stream():
+            yield f'data: {json.dumps({"type": "rag_searching", "query": "current weather"})}\n\n'
+            yield f'data: {json.dumps({"type": "chunk", "content": "Based on current data"})}\n\n'
+            yield f'data: {json.dumps({"type": "complete"})}\n\n'
+        
+        mock_stream.return_value = mock_rag_stream()
+        
+        # Test message that should trigger RAG
+        response = client.post(
+            "/api/v1/chat/stream",
+            json={"message": "What's the current weather like?"},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert "rag_searching" in response.text
     
-    @pytest.mark.asyncio
-    async def test_error_response_format(self, client):
+    def test_error_response_format(self, client):
         """Test that errors return proper JSON format"""
         # Test unauthenticated request
         response = client.post(
@@ -278,14 +289,18 @@ class TestChatStreamingAPI:
 class TestDatabasePersistence:
     """Test database operations and persistence"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_db(self):
-        """Mock database session"""
-        from unittest.mock import MagicMock
+        """Mock database session, built once and shared across tests"""
         return MagicMock()
     
-    @pytest.mark.asyncio
-    async def test_conversation_creation(self, mock_db):
+    @pytest.fixture(autouse=True)
+    def reset_mock_db(self, mock_db):
+        """Reset recorded calls and return values between tests"""
+        yield
+        mock_db.reset_mock(return_value=True, side_effect=True)
+    
+    def test_conversation_creation(self, mock_db):
         """Test conversation creation in database"""
         from app.crud.conversation_crud import ConversationCRUD
         
@@ -302,10 +317,6 @@ class TestDatabasePersistence:
                 'message_count': 0
             })
             
-            mock_db.add.return_value = None
-            mock_db.commit.return_value = None
-            mock_db.refresh.return_value = None
-            
             # Test conversation creation
             with patch.object(crud, 'create_conversation', return_value=mock_conversation):
                 result = crud.create_conversation(
@@ -317,8 +328,7 @@ class TestDatabasePersistence:
                 assert result.title == "Test Conversation"
                 assert result.user_id == 1
     
-    @pytest.mark.asyncio
-    async def test_message_persistence(self, mock_db):
+    def test_message_persistence(self, mock_db):
         """Test message persistence in database"""
         from app.crud.message_crud import MessageCRUD
         
@@ -349,8 +359,7 @@ class TestDatabasePersistence:
                 assert result.role == "user"
                 assert result.content == "Test message"
     
-    @pytest.mark.asyncio
-    async def test_user_conversation_isolation(self, mock_db):
+    def test_user_conversation_isolation(self, mock_db):
         """Test that users can only access their own conversations"""
         from app.crud.conversation_crud import ConversationCRUD
         
@@ -359,9 +368,6 @@ class TestDatabasePersistence:
             
             crud = ConversationCRUD()
             
-            # Mock query result
-            mock_db.query.return_value.filter.return_value.all.return_value = []
-            
             with patch.object(crud, 'get_user_conversations', return_value=[]):
                 # User 1 should not see User 2's conversations
                 user1_conversations = crud.get_user_conversations(user_id=1)
@@ -376,117 +382,87 @@ class TestConversationEndpoints:
     """Test conversation management endpoints"""
     
     @pytest.fixture
-    def client(self):
+    def client(self, app):
         return TestClient(app)
     
     @pytest.fixture
     def auth_headers(self):
         return {"Authorization": "Bearer test.token.here"}
     
-    @pytest.mark.asyncio
-    async def test_list_conversations(self, client, auth_headers):
-        """Test GET /api/v1/conversations"""
-        with patch('app.core.auth.verify_token') as mock_verify:
-            mock_verify.return_value = {"user_id": 1}
-            
-            with patch('app.crud.conversation_crud.ConversationCRUD.get_user_conversations') as mock_get:
-                mock_conversations = [
-                    type('obj', (object,), {
-                        'id': 1,
-                        'title': 'Test Conversation',
-                        'created_at': '2025-09-18T12:00:00Z',
-                        'message_count': 5,
-                        'is_archived': False
-                    })
-                ]
-                mock_get.return_value = mock_conversations
-                
-                response = client.get("/api/v1/conversations", headers=auth_headers)
-                
-                assert response.status_code == 200
-                data = response.json()
-                assert "conversations" in data
-                assert isinstance(data["conversations"], list)
-    
-    @pytest.mark.asyncio
-    async def test_create_conversation(self, client, auth_headers):
-        """Test POST /api/v1/conversations"""
-        with patch('app.core.auth.verify_token') as mock_verify:
-            mock_verify.return_value = {"user_id": 1}
-            
-            with patch('app.crud.conversation_crud.ConversationCRUD.create_conversation') as mock_create:
-                mock_conversation = type('obj', (object,), {
-                    'id': 1,
-                    'title': 'New Conversation',
-                    'user_id': 1,
-                    'created_at': '2025-09-18T12:00:00Z',
-                    'message_count': 0
-                })
-                mock_create.return_value = mock_conversation
-                
-                response = client.post(
-                    "/api/v1/conversations",
-                    json={"title": "New Conversation"},
-                    headers=auth_headers
-                )
-                
-                assert response.status_code == 201
-                data = response.json()
-                assert data["title"] == "New Conversation"
-                assert data["id"] == 1
-    
-    @pytest.mark.asyncio
-    async def test_get_conversation_by_id(self, client, auth_headers):
-        """Test GET /api/v1/conversations/{id}"""
-        with patch('app.core.auth.verify_token') as mock_verify:
-            mock_verify.return_value = {"user_id": 1}
-            
-            with patch('app.crud.conversation_crud.ConversationCRUD.get_conversation') as mock_get:
-                mock_conversation = type('obj', (object,), {
-                    'id': 1,
-                    'title': 'Test Conversation',
-                    'user_id': 1,
-                    'messages': []
-                })
-                mock_get.return_value = mock_conversation
-                
-                response = client.get("/api/v1/conversations/1", headers=auth_headers)
-                
-                assert response.status_code == 200
-                data = response.json()
-                assert data["id"] == 1
-                assert data["title"] == "Test Conversation"
-    
-    @pytest.mark.asyncio
-    async def test_delete_conversation(self, client, auth_headers):
-        """Test DELETE /api/v1/conversations/{id}"""
-        with patch('app.core.auth.verify_token') as mock_verify:
-            mock_verify.return_value = {"user_id": 1}
-            
-            with patch('app.crud.conversation_crud.ConversationCRUD.delete_conversation') as mock_delete:
-                mock_delete.return_value = True
-                
-                response = client.delete("/api/v1/conversations/1", headers=auth_headers)
-                
-                assert response.status_code == 200
-                data = response.json()
-                assert "deleted" in data["message"].lower()
-    
-    @pytest.mark.asyncio
-    async def test_conversation_not_found(self, client, auth_headers):
-        """Test accessing non-existent conversation"""
+    @pytest.mark.parametrize(
+        "method,path,payload,crud_fn,crud_ret,expected_status,check",
+        [
+            pytest.param(
+                "get", "/api/v1/conversations", None,
+                "get_user_conversations",
+                [SimpleNamespace(
+                    id=1,
+                    title="Test Conversation",
+                    created_at="2025-09-18T12:00:00Z",
+                    message_count=5,
+                    is_archived=False
+                )],
+                200,
+                lambda data: "conversations" in data and isinstance(data["conversations"], list),
+                id="list_conversations"
+            ),
+            pytest.param(
+                "post", "/api/v1/conversations", {"title": "New Conversation"},
+                "create_conversation",
+                SimpleNamespace(
+                    id=1,
+                    title="New Conversation",
+                    user_id=1,
+                    created_at="2025-09-18T12:00:00Z",
+                    message_count=0
+                ),
+                201,
+                lambda data: data["title"] == "New Conversation" and data["id"] == 1,
+                id="create_conversation"
+            ),
+            pytest.param(
+                "get", "/api/v1/conversations/1", None,
+                "get_conversation",
+                SimpleNamespace(id=1, title="Test Conversation", user_id=1, messages=[]),
+                200,
+                lambda data: data["id"] == 1 and data["title"] == "Test Conversation",
+                id="get_conversation_by_id"
+            ),
+            pytest.param(
+                "delete", "/api/v1/conversations/1", None,
+                "delete_conversation",
+                True,
+                200,
+                lambda data: "deleted" in data["message"].lower(),
+                id="delete_conversation"
+            ),
+            pytest.param(
+                "get", "/api/v1/conversations/999", None,
+                "get_conversation",
+                None,
+                404,
+                lambda data: "not found" in data["detail"].lower(),
+                id="conversation_not_found"
+            ),
+        ]
+    )
+    def test_conversation_endpoint(
+        self, client, auth_headers, method, path, payload, crud_fn, crud_ret, expected_status, check
+    ):
+        """Test /api/v1/conversations endpoints against a mocked CRUD method"""
         with patch('app.core.auth.verify_token') as mock_verify:
             mock_verify.return_value = {"user_id": 1}
             
-            with patch('app.crud.conversation_crud.ConversationCRUD.get_conversation') as mock_get:
-                mock_get.return_value = None
+            with patch(f'app.crud.conversation_crud.ConversationCRUD.{crud_fn}') as mock_crud:
+                mock_crud.return_value = crud_ret
                 
-                response = client.get("/api/v1/conversations/999", headers=auth_headers)
+                request_kwargs = {"headers": auth_headers}
+                if payload is not None:
+                    request_kwargs["json"] = payload
+                response = getattr(client, method)(path, **request_kwargs)
                 
-                assert response.status_code == 404
-                data = response.json()
-                assert "not found" in data["detail"].lower()
-
+                assert response.status_code == expected_status
+                assert check(response.json())
 
 if __name__ == "__main__":
     # Run tests with coverage
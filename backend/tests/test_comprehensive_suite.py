@@ -5,29 +5,88 @@ Created by: Rajan Mishra
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
 import json
-from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
-from fastapi.testclient import TestClient
-from httpx import AsyncClient
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import create_engine, event, func, select, text, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 import tempfile
 import os
+import uuid
 
 # Import our application
 from main import app
-from app.core.database import get_db, Base
-from app.services.chat_service import EnhancedChatService
-from app.services.agentic_service import AdvancedAgenticService
-from app.services.multi_tool_orchestrator import AdvancedToolOrchestrator
-from app.schemas.chat import ChatRequest, MessageCreate
+from app.core.database import get_db
+from app.core.dependencies import get_current_active_user
+from app.api.chat_enhanced import health_check, create_conversation, get_conversations
+from app.schemas.chat import ChatRequest, MessageCreate, ConversationCreate
 from app.crud import conversation_crud, message_crud
+from app.models.conversation import Base, Conversation
+from app.models.user import User
+from tests.conftest import FROZEN_NOW
 
-# Test database setup - Use SQLite for testing (CI-compatible)
-SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test_suite.db"
+# Test database setup - In-memory SQLite by default (CI-compatible);
+# set TEST_DATABASE_URL to run against PostgreSQL, e.g. for integration tests
+SQLALCHEMY_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+# Isolate pytest-xdist workers: in-memory SQLite already is private, a SQLite
+# file gets a per-worker copy and PostgreSQL a per-worker schema (see test_database.py)
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+TEST_SCHEMA = f"test_{XDIST_WORKER}"
+IS_SQLITE = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "sqlite"
+if IS_SQLITE and not SQLALCHEMY_DATABASE_URL.endswith(":memory:"):
+    _url = make_url(SQLALCHEMY_DATABASE_URL)
+    _stem, _ext = os.path.splitext(_url.database)
+    SQLALCHEMY_DATABASE_URL = _url.set(database=f"{_stem}_{XDIST_WORKER}{_ext}").render_as_string(hide_password=False)
+
+# Injection payloads exercised by the security scenarios
+MALICIOUS_INPUTS = [
+    "'; DROP TABLE conversations; --",
+    "<script>alert('xss')</script>",
+    "../../etc/passwd",
+    "{{7*7}}"  # Template injection
+]
+
+# 10KB message, JSON-encoded once for the large-message test
+LARGE_MESSAGE = "A" * 10000
+LARGE_PAYLOAD_BYTES = json.dumps({"message": LARGE_MESSAGE, "conversation_id": None}).encode()
+JSON_HEADERS = {"content-type": "application/json"}
+
+# Fixed timestamps keep mocked records deterministic
+FROZEN_ISO = FROZEN_NOW.isoformat()
+
+# Pre-encoded SSE payloads yielded by the mocked chat service
+_SSE_WORKFLOW_START = b'data: {"type": "workflow_start"}\n\n'
+_SSE_WORKFLOW_START_MESSAGE = b'data: {"type": "workflow_start", "message": "Starting..."}\n\n'
+_SSE_CONNECTED = b'data: {"type": "connected", "conversation_id": 1}\n\n'
+_SSE_PROGRESS_ORCHESTRATE = b'data: {"type": "workflow_progress", "step": "orchestrate"}\n\n'
+_SSE_PROGRESS_ANALYZE = b'data: {"type": "workflow_progress", "step": "analyze"}\n\n'
+_SSE_RESPONSE_START = b'data: {"type": "response_start"}\n\n'
+_SSE_CONTENT_HELLO = b'data: {"type": "content", "content": "Hello"}\n\n'
+_SSE_CONTENT_RESPONSE = b'data: {"type": "content", "content": "Response"}\n\n'
+_SSE_CONTENT_TEST_RESPONSE = b'data: {"type": "content", "content": "This is a test response"}\n\n'
+_SSE_CONTENT_LARGE = b'data: {"type": "content", "content": "Processed large message"}\n\n'
+_SSE_CONTENT_SAFE = b'data: {"type": "content", "content": "Safe response"}\n\n'
+_SSE_WORKFLOW_SUMMARY = b'data: {"type": "workflow_summary"}\n\n'
+_SSE_COMPLETE = b'data: {"type": "complete"}\n\n'
+
+# Full agentic workflow as streamed by the chat service
+MOCK_STREAM_CHUNKS = (
+    _SSE_WORKFLOW_START,
+    _SSE_PROGRESS_ORCHESTRATE,
+    _SSE_PROGRESS_ANALYZE,
+    _SSE_RESPONSE_START,
+    _SSE_CONTENT_TEST_RESPONSE,
+    _SSE_WORKFLOW_SUMMARY,
+    _SSE_COMPLETE
+)
+
+# Conversation returned by the patched CRUD layer
+MOCK_CONV = MagicMock(id=1)
 
 class TestConfig:
     """Test configuration"""
@@ -35,45 +94,82 @@ class TestConfig:
     OPENAI_API_KEY = "test-key"
     TEST_MODE = True
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-@pytest.fixture(scope="session")
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def async_engine():
     """Create test database engine"""
+    if "+asyncpg" in SQLALCHEMY_DATABASE_URL:
+        pytest.importorskip("asyncpg")
+    
+    if IS_SQLITE:
+        # A single shared connection keeps the in-memory database alive; it only
+        # ever holds the schema because async_session rolls back every test
+        engine_options = {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False}
+        }
+    else:
+        engine_options = {
+            "connect_args": {"server_settings": {"search_path": TEST_SCHEMA}}
+        }
+    
     engine = create_async_engine(
         SQLALCHEMY_DATABASE_URL,
         echo=False,
-        future=True
+        future=True,
+        **engine_options
     )
     
-    # Create tables
+    if IS_SQLITE:
+        # pysqlite/aiosqlite defer BEGIN and mishandle SAVEPOINT; emit BEGIN
+        # ourselves so the per-test rollback also undoes CRUD commits
+        @event.listens_for(engine.sync_engine, "connect")
+        def _disable_pysqlite_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+        
+        @event.listens_for(engine.sync_engine, "begin")
+        def _emit_begin(conn):
+            conn.exec_driver_sql("BEGIN")
+    
+    # Create tables once; tests roll back their own transactions
     async with engine.begin() as conn:
+        if not IS_SQLITE:
+            await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{TEST_SCHEMA}"'))
         await conn.run_sync(Base.metadata.create_all)
     
     yield engine
     
-    # Cleanup
+    # Cleanup at session exit
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+        if IS_SQLITE:
+            await conn.run_sync(Base.metadata.drop_all)
+        else:
+            await conn.execute(text(f'DROP SCHEMA IF EXISTS "{TEST_SCHEMA}" CASCADE'))
     
     await engine.dispose()
 
-@pytest.fixture
-async def async_session(async_engine):
-    """Create test database session"""
-    async_session_maker = sessionmaker(
-        async_engine, class_=AsyncSession, expire_on_commit=False
+@pytest.fixture(scope="session")
+def async_session_maker():
+    """Create the session factory once; each test binds it to its own connection"""
+    # CRUD commits only release a SAVEPOINT and the outer transaction is rolled back;
+    # on SQLite this relies on the BEGIN listeners installed by async_engine
+    return async_sessionmaker(
+        class_=AsyncSession,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint"
     )
-    
-    async with async_session_maker() as session:
-        yield session
 
-@pytest.fixture
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_session(async_engine, async_session_maker):
+    """Create test database session inside a transaction rolled back after each test"""
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            async with async_session_maker(bind=conn) as session:
+                yield session
+        finally:
+            await trans.rollback()
+
+@pytest_asyncio.fixture(loop_scope="session")
 async def override_get_db(async_session):
     """Override database dependency for testing"""
     def _override_get_db():
@@ -83,39 +179,64 @@ async def override_get_db(async_session):
     yield
     app.dependency_overrides.clear()
 
+@pytest_asyncio.fixture(loop_scope="session")
+async def override_get_db_per_request(async_session, async_session_maker):
+    """Override database dependency with a fresh session for every request"""
+    # Sessions sharing the test connection cannot overlap; queue them like a pool of one
+    connection_lock = asyncio.Lock()
+    
+    async def _override_get_db():
+        async with connection_lock:
+            async with async_session_maker(bind=async_session.bind) as session:
+                yield session
+    
+    app.dependency_overrides[get_db] = _override_get_db
+    yield
+    app.dependency_overrides.clear()
+
 @pytest.fixture
-def client():
-    """Create test client"""
-    return TestClient(app)
+def test_user():
+    """Active user passed to user-scoped endpoints"""
+    return User(id=uuid.uuid4(), email="tester@example.com", username="tester", is_active=True)
 
 @pytest.fixture
+def override_current_user(test_user):
+    """Authenticate every request as test_user"""
+    app.dependency_overrides[get_current_active_user] = lambda: test_user
+    yield test_user
+    app.dependency_overrides.pop(get_current_active_user, None)
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def async_client():
-    """Create async test client"""
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    """Create async test client shared by the whole session (no lifespan run)"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
 
 class TestHealthEndpoint:
     """Test health check functionality"""
     
-    def test_health_check(self, client):
+    async def test_health_check(self):
         """Test basic health check"""
-        response = client.get("/api/health")
-        assert response.status_code == 200
+        data = await health_check()
         
-        data = response.json()
         assert data["status"] == "healthy"
         assert "timestamp" in data
         assert data["service"] == "GPT.R1 Enhanced Chat API"
         assert data["agentic_workflow"] == "active"
         assert data["postgresql"] == "connected"
+    
+    async def test_health_check_http(self, async_client):
+        """Test health check through the HTTP stack"""
+        response = await async_client.get("/api/v1/health")
+        
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
 
 class TestDatabaseOperations:
     """Test database CRUD operations"""
     
     async def test_conversation_creation(self, async_session, override_get_db):
         """Test conversation creation"""
-        from backend.app.schemas.chat import ConversationCreate
-        
         conversation_data = ConversationCreate(title="Test Conversation")
         conversation = await conversation_crud.create(async_session, obj_in=conversation_data)
         
@@ -125,8 +246,6 @@ class TestDatabaseOperations:
     
     async def test_message_creation(self, async_session, override_get_db):
         """Test message creation"""
-        from backend.app.schemas.chat import ConversationCreate
-        
         # Create conversation first
         conversation_data = ConversationCreate(title="Test Conversation")
         conversation = await conversation_crud.create(async_session, obj_in=conversation_data)
@@ -146,8 +265,6 @@ class TestDatabaseOperations:
     
     async def test_conversation_history_retrieval(self, async_session, override_get_db):
         """Test conversation history retrieval"""
-        from backend.app.schemas.chat import ConversationCreate
-        
         # Create conversation
         conversation_data = ConversationCreate(title="Test Conversation")
         conversation = await conversation_crud.create(async_session, obj_in=conversation_data)
@@ -159,8 +276,7 @@ class TestDatabaseOperations:
             MessageCreate(conversation_id=conversation.id, content="How are you?", role="user")
         ]
         
-        for msg_data in messages_data:
-            await message_crud.create(async_session, obj_in=msg_data)
+        await message_crud.create_many(async_session, objs_in=messages_data)
         
         # Retrieve messages
         messages = await message_crud.get_messages_by_conversation(
@@ -171,13 +287,67 @@ class TestDatabaseOperations:
         assert messages[0].content == "Hello"
         assert messages[1].content == "Hi there!"
         assert messages[2].content == "How are you?"
+    
+    async def test_create_many_messages(self, async_session, override_get_db):
+        """Test bulk message creation"""
+        conversation_data = ConversationCreate(title="Test Conversation")
+        conversation = await conversation_crud.create(async_session, obj_in=conversation_data)
+        
+        # Backdate the conversation so the updated_at bump is observable
+        await async_session.execute(
+            update(Conversation).where(Conversation.id == conversation.id).values(updated_at=FROZEN_NOW)
+        )
+        
+        messages_data = [
+            MessageCreate(conversation_id=conversation.id, content="Hello", role="user"),
+            MessageCreate(conversation_id=conversation.id, content="Hi there!", role="assistant")
+        ]
+        
+        messages = await message_crud.create_many(async_session, objs_in=messages_data)
+        
+        assert [message.content for message in messages] == ["Hello", "Hi there!"]
+        assert [message.role for message in messages] == ["user", "assistant"]
+        assert all(message.conversation_id == conversation.id for message in messages)
+        assert all(message.id is not None for message in messages)
+        assert len({message.id for message in messages}) == 2
+        
+        await async_session.refresh(conversation)
+        assert conversation.updated_at.replace(tzinfo=None) > FROZEN_NOW
+    
+    async def test_create_many_empty(self, async_session):
+        """Test bulk message creation with nothing to insert"""
+        assert await message_crud.create_many(async_session, objs_in=[]) == []
+
+@pytest.mark.xdist_group("db_isolation")
+class TestTransactionIsolation:
+    """Rows committed inside a test transaction must not survive its rollback"""
+    
+    async def test_commit_rolled_back_with_test_transaction(self, async_engine, async_session_maker):
+        """A CRUD commit is visible in the test transaction and gone once it rolls back"""
+        probe = select(func.count()).select_from(Conversation).where(Conversation.title == "Isolation probe")
+        
+        # Same setup as async_session, so the rollback can be checked in this test
+        async with async_engine.connect() as conn:
+            trans = await conn.begin()
+            async with async_session_maker(bind=conn) as session:
+                conversation = await conversation_crud.create(
+                    session, obj_in=ConversationCreate(title="Isolation probe")
+                )
+                
+                assert conversation.id is not None
+                assert await session.scalar(probe) == 1
+            await trans.rollback()
+        
+        async with async_engine.connect() as conn:
+            assert await conn.scalar(probe) == 0
 
 class TestAgenticService:
     """Test advanced agentic service functionality"""
     
-    @pytest.fixture
-    def agentic_service(self):
-        """Create agentic service instance"""
+    @pytest_asyncio.fixture(scope="session", loop_scope="session")
+    async def agentic_service(self):
+        """Create agentic service instance shared across the session (patch via context managers only)"""
+        from app.services.agentic_service import AdvancedAgenticService
         return AdvancedAgenticService()
     
     async def test_agentic_workflow_execution(self, agentic_service):
@@ -236,9 +406,10 @@ class TestAgenticService:
 class TestMultiToolOrchestrator:
     """Test multi-tool orchestration system"""
     
-    @pytest.fixture
-    def orchestrator(self):
-        """Create orchestrator instance"""
+    @pytest_asyncio.fixture(scope="session", loop_scope="session")
+    async def orchestrator(self):
+        """Create orchestrator instance shared across the session (patch via context managers only)"""
+        from app.services.multi_tool_orchestrator import AdvancedToolOrchestrator
         return AdvancedToolOrchestrator()
     
     async def test_orchestrator_initialization(self, orchestrator):
@@ -296,6 +467,7 @@ class TestChatService:
     @pytest.fixture
     def chat_service(self):
         """Create chat service instance"""
+        from app.services.chat_service import EnhancedChatService
         return EnhancedChatService()
     
     async def test_chat_service_initialization(self, chat_service):
@@ -308,8 +480,8 @@ class TestChatService:
         # Mock database session
         with patch.object(message_crud, 'get_messages_by_conversation') as mock_get_messages:
             mock_messages = [
-                MagicMock(role="user", content="Hello", created_at=datetime.now()),
-                MagicMock(role="assistant", content="Hi!", created_at=datetime.now())
+                MagicMock(role="user", content="Hello", created_at=FROZEN_NOW),
+                MagicMock(role="assistant", content="Hi!", created_at=FROZEN_NOW)
             ]
             mock_get_messages.return_value = mock_messages
             
@@ -321,151 +493,158 @@ class TestChatService:
             assert history[1]["role"] == "assistant"
             assert history[1]["content"] == "Hi!"
 
+@pytest.mark.xdist_group("streaming")
 class TestStreamingAPI:
     """Test streaming API functionality"""
     
-    async def test_streaming_endpoint_basic(self, async_client, override_get_db):
+    async def test_streaming_endpoint_basic(self, async_client, override_get_db, fake_chat_service):
         """Test basic streaming endpoint functionality"""
-        # Mock the services to avoid external API calls
-        with patch('backend.app.services.chat_service.EnhancedChatService') as mock_service_class:
-            mock_service = AsyncMock()
-            mock_service_class.return_value = mock_service
-            
-            # Mock streaming response
-            async def mock_stream_response(*args, **kwargs):
-                yield 'data: {"type": "workflow_start", "message": "Starting..."}\n\n'
-                yield 'data: {"type": "content", "content": "Hello"}\n\n'
-                yield 'data: {"type": "complete"}\n\n'
-            
-            mock_service.stream_chat_response = mock_stream_response
-            
-            response = await async_client.post(
-                "/api/chat/stream",
-                json={"message": "Hello, world!", "conversation_id": None}
-            )
-            
+        # Fake streaming response avoids external API calls
+        fake_chat_service.chunks = [_SSE_WORKFLOW_START_MESSAGE, _SSE_CONTENT_HELLO, _SSE_COMPLETE]
+        
+        async with async_client.stream(
+            "POST",
+            "/api/v1/chat/stream",
+            json={"message": "Hello, world!", "conversation_id": None}
+        ) as response:
             assert response.status_code == 200
             assert response.headers["content-type"] == "text/event-stream"
+            
+            # Only the first event is needed; the rest of the stream is never read
+            first_chunk = await anext(response.aiter_bytes())
+            assert first_chunk.startswith(b"data:")
     
-    async def test_streaming_with_conversation_id(self, async_client, override_get_db):
+    async def test_streaming_with_conversation_id(self, async_client, override_get_db, fake_chat_service, monkeypatch):
         """Test streaming with existing conversation"""
-        # Create a conversation first
-        with patch('backend.app.crud.conversation_crud.get') as mock_get_conv:
-            mock_conv = MagicMock()
-            mock_conv.id = 1
-            mock_get_conv.return_value = mock_conv
-            
-            with patch('backend.app.services.chat_service.EnhancedChatService') as mock_service_class:
-                mock_service = AsyncMock()
-                mock_service_class.return_value = mock_service
-                
-                async def mock_stream_response(*args, **kwargs):
-                    yield 'data: {"type": "connected", "conversation_id": 1}\n\n'
-                    yield 'data: {"type": "content", "content": "Response"}\n\n'
-                
-                mock_service.stream_chat_response = mock_stream_response
-                
-                response = await async_client.post(
-                    "/api/chat/stream",
-                    json={"message": "Test message", "conversation_id": 1}
-                )
-                
-                assert response.status_code == 200
+        # Existing conversation
+        monkeypatch.setattr(conversation_crud, "get", AsyncMock(return_value=MOCK_CONV))
+        fake_chat_service.chunks = [_SSE_CONNECTED, _SSE_CONTENT_RESPONSE]
+        
+        response = await async_client.post(
+            "/api/v1/chat/stream",
+            json={"message": "Test message", "conversation_id": 1}
+        )
+        
+        assert response.status_code == 200
     
     async def test_streaming_error_handling(self, async_client, override_get_db):
         """Test streaming error handling"""
         response = await async_client.post(
-            "/api/chat/stream",
+            "/api/v1/chat/stream",
             json={"message": "", "conversation_id": None}  # Empty message should fail
         )
         
-        assert response.status_code == 400
+        # ChatRequest rejects it before the handler's own 400 check runs
+        assert response.status_code == 422
 
 class TestConversationAPI:
     """Test conversation management API"""
     
-    async def test_create_conversation(self, async_client, override_get_db):
+    async def test_create_conversation(self, async_session):
         """Test conversation creation endpoint"""
-        with patch('backend.app.crud.conversation_crud.create') as mock_create:
+        with patch.object(conversation_crud, 'create') as mock_create:
             mock_conv = MagicMock()
             mock_conv.id = 1
             mock_conv.title = "Test Conversation"
             mock_create.return_value = mock_conv
             
-            response = await async_client.post(
-                "/api/conversations",
-                json={"title": "Test Conversation"}
+            conversation = await create_conversation(
+                ConversationCreate(title="Test Conversation"), db=async_session
             )
             
-            assert response.status_code == 200
+            assert conversation.id == 1
+            assert conversation.title == "Test Conversation"
     
-    async def test_get_conversations(self, async_client, override_get_db):
+    async def test_get_conversations(self, async_session, test_user):
         """Test conversation list endpoint"""
-        with patch('backend.app.crud.conversation_crud.get_conversation_summaries') as mock_get:
+        with patch.object(conversation_crud, 'get_conversation_summaries') as mock_get:
             mock_conversations = [
-                {"id": 1, "title": "Conv 1", "created_at": datetime.now().isoformat()},
-                {"id": 2, "title": "Conv 2", "created_at": datetime.now().isoformat()}
+                {"id": 1, "title": "Conv 1", "created_at": FROZEN_ISO},
+                {"id": 2, "title": "Conv 2", "created_at": FROZEN_ISO}
             ]
             mock_get.return_value = mock_conversations
             
-            response = await async_client.get("/api/conversations")
+            data = await get_conversations(db=async_session, current_user=test_user)
             
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data) == 2
+            assert len(data["conversations"]) == 2
+    
+    async def test_create_conversation_http(self, async_client, override_get_db):
+        """Test conversation creation through the HTTP stack"""
+        response = await async_client.post("/api/v1/conversations", json={"title": "Test Conversation"})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] is not None
+        assert data["title"] == "Test Conversation"
+    
+    async def test_create_conversation_http_validation(self, async_client, override_get_db):
+        """Test that a malformed body is rejected before reaching the handler"""
+        response = await async_client.post("/api/v1/conversations", json={"title": 42})
+        
+        assert response.status_code == 422
+    
+    async def test_get_conversations_http(self, async_client, override_get_db, override_current_user, monkeypatch):
+        """Test conversation listing through the HTTP stack"""
+        mock_get = AsyncMock(return_value=[
+            {"id": 1, "title": "Conv 1", "created_at": FROZEN_ISO},
+            {"id": 2, "title": "Conv 2", "created_at": FROZEN_ISO}
+        ])
+        monkeypatch.setattr(conversation_crud, "get_conversation_summaries", mock_get)
+        
+        response = await async_client.get("/api/v1/conversations", params={"limit": 500})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["conversations"]) == 2
+        assert data["pagination"]["limit"] == 20  # Out-of-range limit falls back to the default
+    
+    async def test_get_conversations_http_requires_user(self, async_client, override_get_db):
+        """Test that the conversation list is not served without authentication"""
+        response = await async_client.get("/api/v1/conversations")
+        
+        assert response.status_code in [401, 403]
 
+@pytest.mark.integration
+@pytest.mark.xdist_group("streaming")
 class TestIntegrationScenarios:
     """Test complex integration scenarios"""
     
-    async def test_full_chat_workflow(self, async_client, override_get_db):
+    async def test_full_chat_workflow(self, async_client, override_get_db, fake_chat_service, monkeypatch):
         """Test complete chat workflow from start to finish"""
+        monkeypatch.setattr(conversation_crud, "create", AsyncMock(return_value=MOCK_CONV))
+        monkeypatch.setattr(conversation_crud, "get", AsyncMock(return_value=MOCK_CONV))
+        fake_chat_service.chunks = MOCK_STREAM_CHUNKS
+        
         # 1. Create conversation
-        with patch('backend.app.crud.conversation_crud.create') as mock_create_conv:
-            mock_conv = MagicMock()
-            mock_conv.id = 1
-            mock_create_conv.return_value = mock_conv
-            
-            conv_response = await async_client.post(
-                "/api/conversations",
-                json={"title": "Integration Test"}
-            )
-            assert conv_response.status_code == 200
+        conv_response = await async_client.post(
+            "/api/v1/conversations",
+            json={"title": "Integration Test"}
+        )
+        assert conv_response.status_code == 200
         
         # 2. Send message and test streaming
-        with patch('backend.app.services.chat_service.EnhancedChatService') as mock_service_class:
-            mock_service = AsyncMock()
-            mock_service_class.return_value = mock_service
-            
-            async def mock_stream_response(*args, **kwargs):
-                yield 'data: {"type": "workflow_start"}\n\n'
-                yield 'data: {"type": "workflow_progress", "step": "orchestrate"}\n\n'
-                yield 'data: {"type": "workflow_progress", "step": "analyze"}\n\n'
-                yield 'data: {"type": "response_start"}\n\n'
-                yield 'data: {"type": "content", "content": "This is a test response"}\n\n'
-                yield 'data: {"type": "workflow_summary"}\n\n'
-                yield 'data: {"type": "complete"}\n\n'
-            
-            mock_service.stream_chat_response = mock_stream_response
-            
-            chat_response = await async_client.post(
-                "/api/chat/stream",
-                json={"message": "Tell me about AI", "conversation_id": 1}
-            )
-            
+        async with async_client.stream(
+            "POST",
+            "/api/v1/chat/stream",
+            json={"message": "Tell me about AI", "conversation_id": 1}
+        ) as chat_response:
             assert chat_response.status_code == 200
+            
+            first_chunk = await anext(chat_response.aiter_bytes())
+            assert first_chunk.startswith(b"data:")
     
     async def test_error_recovery_scenarios(self, async_client, override_get_db):
         """Test various error recovery scenarios"""
         # Test invalid conversation ID
         response = await async_client.post(
-            "/api/chat/stream",
+            "/api/v1/chat/stream",
             json={"message": "Test", "conversation_id": 99999}
         )
         assert response.status_code == 404
         
         # Test malformed request
         response = await async_client.post(
-            "/api/chat/stream",
+            "/api/v1/chat/stream",
             json={"invalid": "data"}
         )
         assert response.status_code == 422  # Validation error
@@ -473,84 +652,63 @@ class TestIntegrationScenarios:
 class TestPerformanceScenarios:
     """Test performance-related scenarios"""
     
-    async def test_concurrent_requests(self, async_client, override_get_db):
+    async def test_concurrent_requests(self, async_client, override_get_db_per_request, fake_chat_service):
         """Test handling of concurrent requests"""
-        with patch('backend.app.services.chat_service.EnhancedChatService') as mock_service_class:
-            mock_service = AsyncMock()
-            mock_service_class.return_value = mock_service
-            
-            async def mock_stream_response(*args, **kwargs):
-                yield 'data: {"type": "content", "content": "Response"}\n\n'
-                yield 'data: {"type": "complete"}\n\n'
-            
-            mock_service.stream_chat_response = mock_stream_response
-            
-            # Send multiple concurrent requests
-            tasks = []
-            for i in range(5):
-                task = async_client.post(
-                    "/api/chat/stream",
+        fake_chat_service.chunks = [_SSE_CONTENT_RESPONSE, _SSE_COMPLETE]
+        request_count = 5
+        
+        # Bound in-flight requests like a connection pool of 4
+        semaphore = asyncio.Semaphore(4)
+        
+        async def send(i):
+            async with semaphore:
+                return await async_client.post(
+                    "/api/v1/chat/stream",
                     json={"message": f"Test message {i}", "conversation_id": None}
                 )
-                tasks.append(task)
-            
-            responses = await asyncio.gather(*tasks)
-            
-            # All requests should succeed
-            for response in responses:
-                assert response.status_code == 200
+        
+        # Send multiple concurrent requests
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(send(i)) for i in range(request_count)]
+        
+        # All requests should succeed
+        for task in tasks:
+            assert task.result().status_code == 200
     
-    async def test_large_message_handling(self, async_client, override_get_db):
+    async def test_large_message_handling(self, async_client, override_get_db, fake_chat_service):
         """Test handling of large messages"""
-        large_message = "A" * 10000  # 10KB message
+        fake_chat_service.chunks = [_SSE_CONTENT_LARGE, _SSE_COMPLETE]
         
-        with patch('backend.app.services.chat_service.EnhancedChatService') as mock_service_class:
-            mock_service = AsyncMock()
-            mock_service_class.return_value = mock_service
-            
-            async def mock_stream_response(*args, **kwargs):
-                yield 'data: {"type": "content", "content": "Processed large message"}\n\n'
-                yield 'data: {"type": "complete"}\n\n'
-            
-            mock_service.stream_chat_response = mock_stream_response
-            
-            response = await async_client.post(
-                "/api/chat/stream",
-                json={"message": large_message, "conversation_id": None}
-            )
-            
+        async with async_client.stream(
+            "POST",
+            "/api/v1/chat/stream",
+            content=LARGE_PAYLOAD_BYTES,
+            headers=JSON_HEADERS
+        ) as response:
             assert response.status_code == 200
+            
+            first_chunk = await anext(response.aiter_bytes())
+            assert first_chunk.startswith(b"data:")
 
 class TestSecurityScenarios:
     """Test security-related scenarios"""
     
-    async def test_injection_prevention(self, async_client, override_get_db):
+    @pytest.fixture(autouse=True)
+    def safe_chat_service(self, fake_chat_service):
+        """Stream a safe canned response for every injection payload"""
+        fake_chat_service.chunks = [_SSE_CONTENT_SAFE, _SSE_COMPLETE]
+        return fake_chat_service
+    
+    @pytest.mark.parametrize("malicious_input", MALICIOUS_INPUTS, ids=["sqli", "xss", "traversal", "tmpl"])
+    async def test_injection_prevention(self, async_client, override_get_db, malicious_input):
         """Test prevention of injection attacks"""
-        malicious_inputs = [
-            "'; DROP TABLE conversations; --",
-            "<script>alert('xss')</script>",
-            "../../etc/passwd",
-            "{{7*7}}"  # Template injection
-        ]
+        response = await async_client.post(
+            "/api/v1/chat/stream",
+            json={"message": malicious_input, "conversation_id": None}
+        )
         
-        with patch('backend.app.services.chat_service.EnhancedChatService') as mock_service_class:
-            mock_service = AsyncMock()
-            mock_service_class.return_value = mock_service
-            
-            async def mock_stream_response(*args, **kwargs):
-                yield 'data: {"type": "content", "content": "Safe response"}\n\n'
-                yield 'data: {"type": "complete"}\n\n'
-            
-            mock_service.stream_chat_response = mock_stream_response
-            
-            for malicious_input in malicious_inputs:
-                response = await async_client.post(
-                    "/api/chat/stream",
-                    json={"message": malicious_input, "conversation_id": None}
-                )
-                
-                # Should still process but safely
-                assert response.status_code in [200, 400]  # Either process safely or reject
+        # Should still process but safely
+        assert response.status_code in [200, 400]  # Either process safely or reject
 
 # Test runner functions
 def run_basic_tests():
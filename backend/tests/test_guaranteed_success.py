@@ -3,66 +3,36 @@ Absolutely minimal test that is guaranteed to pass in any CI environment
 This file uses only basic Python features and no external dependencies
 """
 
-def test_always_true():
-    """This test always passes"""
-    assert True
+# (name, check) pairs shared by pytest and the manual runner below
+CHECKS = [
+    ("always_true", lambda: True),
+    ("math_basic", lambda: (1 == 1, 2 == 2, 3 == 3) == (True, True, True)),
+    ("string_basic", lambda: "a" == "a" and "test" == "test"),
+    ("python_working", lambda: 1 == 1),
+    ("import_basic", lambda: bool(__import__("os") and __import__("sys"))),
+]
 
-def test_math_basic():
-    """Test basic math operations"""
-    assert 1 == 1
-    assert 2 == 2
-    assert 3 == 3
+try:
+    import pytest
+except ImportError:  # Manual runner still works without pytest
+    pytest = None
 
-def test_string_basic():
-    """Test basic string operations"""
-    assert "a" == "a"
-    assert "test" == "test"
-
-def test_python_working():
-    """Test Python is functioning"""
-    x = 1
-    y = 1
-    assert x == y
-
-def test_import_basic():
-    """Test basic imports work"""
-    import os
-    import sys
-    assert True
+if pytest is not None:
+    @pytest.mark.parametrize("check", [check for _, check in CHECKS], ids=[name for name, _ in CHECKS])
+    def test_guaranteed(check):
+        """Each basic check always passes"""
+        assert check()
 
 # Manual test runner for CI environments that might not have pytest
 if __name__ == "__main__":
     print("🔍 Running guaranteed success tests...")
-    
-    try:
-        test_always_true()
-        print("✅ test_always_true: PASSED")
-    except Exception as e:
-        print(f"❌ test_always_true: FAILED - {e}")
-    
-    try:
-        test_math_basic()
-        print("✅ test_math_basic: PASSED")
-    except Exception as e:
-        print(f"❌ test_math_basic: FAILED - {e}")
-    
-    try:
-        test_string_basic()
-        print("✅ test_string_basic: PASSED")
-    except Exception as e:
-        print(f"❌ test_string_basic: FAILED - {e}")
-    
-    try:
-        test_python_working()
-        print("✅ test_python_working: PASSED")
-    except Exception as e:
-        print(f"❌ test_python_working: FAILED - {e}")
-    
-    try:
-        test_import_basic()
-        print("✅ test_import_basic: PASSED")
-    except Exception as e:
-        print(f"❌ test_import_basic: FAILED - {e}")
-    
+
+    for name, check in CHECKS:
+        try:
+            assert check()
+            print(f"✅ test_{name}: PASSED")
+        except Exception as e:
+            print(f"❌ test_{name}: FAILED - {e}")
+
     print("🎉 All guaranteed tests completed!")
-    print("✅ Backend functionality verified!")
\ No newline at end of file
+    print("✅ Backend functionality verified!")
@@ -3,6 +3,7 @@ GPT.R1 - Test Configuration
 Override configuration for testing without database connection
 """
 
+import functools
 import os
 import sys
 from pathlib import Path
@@ -17,6 +18,19 @@ os.environ["TESTING"] = "true"
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
 os.environ["OPENAI_API_KEY"] = "test-key-123"
 
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Minimal app and client, built once per run
+app = FastAPI(title="GPT.R1 Test App")
+
+@app.get("/api/health")
+def health_check():
+    return {"status": "healthy", "service": "GPT.R1 Test"}
+
+client = TestClient(app)
+
+@functools.lru_cache(maxsize=1)
 def setup_test_environment():
     """Setup test environment with mocked dependencies"""
     
@@ -42,22 +56,10 @@ def test_basic_imports():
     mock_get_db, mock_session = setup_test_environment()
     
     try:
-        # Now try to import FastAPI app
-        from fastapi import FastAPI
-        
-        # Create a minimal app for testing
-        app = FastAPI(title="GPT.R1 Test App")
-        
-        @app.get("/api/health")
-        def health_check():
-            return {"status": "healthy", "service": "GPT.R1 Test"}
-        
+        assert isinstance(app, FastAPI)
         print("✅ Basic FastAPI app creation successful")
         
         # Test the health endpoint
-        from fastapi.testclient import TestClient
-        
-        client = TestClient(app)
         response = client.get("/api/health")
         
         assert response.status_code == 200
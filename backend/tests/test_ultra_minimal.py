@@ -38,21 +38,10 @@ def test_imports_working():
     assert True  # If we get here, imports worked
 
 if __name__ == "__main__":
-    # Manual test runner for debugging
-    print("🔍 Running ultra-minimal tests...")
+    # Manual test runner for debugging; reports once after every check has run
     test_python_version()
-    print("✅ Python version check passed")
-    
     test_basic_math()
-    print("✅ Basic math operations passed")
-    
-    test_string_operations() 
-    print("✅ String operations passed")
-    
+    test_string_operations()
     test_list_operations()
-    print("✅ List operations passed")
-    
     test_imports_working()
-    print("✅ Basic imports passed")
-    
-    print("🎉 All ultra-minimal tests passed!")
\ No newline at end of file
+    print("✅ Ultra-minimal tests passed: python, math, strings, lists, imports")